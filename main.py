@@ -1,200 +1,439 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from selenium import webdriver
-from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from selectolax.lexbor import LexborHTMLParser
 from transformers import pipeline
 from googletrans import Translator
 from concurrent.futures import ThreadPoolExecutor
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+import asyncio
+import hashlib
+import json
 import logging
-import traceback
 import threading
 import os
+import httpx
+import torch
 
 # Logging configuration
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+NITTER_URL = os.getenv("NITTER_URL", "https://nitter.net")
+SENTIMENT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")  # "torch", "onnx" or "onnx-int8"
+SENTIMENT_COMPILE = os.getenv("SENTIMENT_COMPILE", "0") == "1"  # torch.compile the torch backend
+SENTIMENT_QUANTIZED_DIR = os.getenv("SENTIMENT_QUANTIZED_DIR", "models/sentiment-int8")
+INFER_URL = os.getenv("INFER_URL")  # optional remote inference server, e.g. text-embeddings-inference
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))  # number of server worker processes
+
+# httpx 0.13 exposes no common timeout base class
+HTTP_TIMEOUTS = (httpx.ConnectTimeout, httpx.ReadTimeout, httpx.WriteTimeout, httpx.PoolTimeout)
+
+# CSS selectors for Nitter's search page markup
+TIMELINE = "div.timeline"
+TIMELINE_ITEM = "div.timeline-item"
+TWEET_LINK = ".tweet-link"
+USERNAME = ".username"
+FULLNAME = ".fullname"
+TWEET_DATE = ".tweet-date"
+TWEET_CONTENT = ".tweet-content"
+TWEET_STAT = ".tweet-stat"
+AVATAR = ".avatar.round"
+SHOW_MORE_LINK = "div.show-more a"
+
 class RequestData(BaseModel):
     text: str
 
-class TwitterSentimentScraper:
-    def __init__(self, headless=True, sentiment_model="cardiffnlp/twitter-roberta-base-sentiment-latest"):
-        """Initializes WebDriver, Sentiment Analysis Pipeline, and Translator."""
+class ScrapeError(Exception):
+    """Raised when a scrape cannot return a complete set of results."""
+
+class LRUCache:
+    """Thread-safe in-process LRU cache for results that are pure functions of their input."""
+
+    def __init__(self, maxsize=50_000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(prefix, text):
+        """Builds a versioned cache key from the md5 of the text."""
+        return f"{prefix}:{hashlib.md5(text.encode('utf-8')).hexdigest()}"
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+# Sentiment and translation caches, shared by all scraper instances
+sentiment_cache = LRUCache(maxsize=int(os.getenv("SENTIMENT_CACHE_SIZE", "50000")))
+translation_cache = LRUCache(maxsize=int(os.getenv("TRANSLATION_CACHE_SIZE", "50000")))
+
+def load_sentiment_pipe(model_name, backend=SENTIMENT_BACKEND):
+    """Builds the sentiment pipeline for the configured inference backend."""
+    if backend == "onnx":
+        # Optional dependency: pip install optimum[onnxruntime]
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        from transformers import AutoTokenizer
+
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        return pipeline("text-classification", model=model, tokenizer=tokenizer)
+
+    if backend == "onnx-int8":
+        # Loads the output of quantize_sentiment_model
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        from transformers import AutoTokenizer
+
+        model = ORTModelForSequenceClassification.from_pretrained(
+            SENTIMENT_QUANTIZED_DIR, file_name="model_quantized.onnx"
+        )
+        tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_QUANTIZED_DIR)
+        return pipeline("text-classification", model=model, tokenizer=tokenizer)
+
+    if torch.cuda.is_available():
+        sentiment_pipe = pipeline(
+            "text-classification", model=model_name, device=0, torch_dtype=torch.float16
+        )
+    else:
+        # Split half the cores between the worker processes, avoid inter-op oversubscription
+        default_threads = max(1, (os.cpu_count() or 2) // (2 * WEB_CONCURRENCY))
+        torch.set_num_threads(int(os.getenv("OMP_NUM_THREADS", default_threads)))
         try:
-            self.geckodriver_path = os.getenv("GECKODRIVER_PATH", "/Users/neeleshpandya/Desktop/tweeter/xcom/geckodriver")
-            options = Options()
-            if headless:
-                options.add_argument("--headless")
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            logger.warning("Inter-op thread count already fixed, leaving it unchanged.")
+        sentiment_pipe = pipeline("text-classification", model=model_name)
 
-            # Initialize WebDriver
-            self.service = Service(self.geckodriver_path)
-            self.driver = webdriver.Firefox(service=self.service, options=options)
-            self.wait = WebDriverWait(self.driver, 5)
+    if SENTIMENT_COMPILE and not hasattr(torch, "compile"):
+        logger.warning(f"SENTIMENT_COMPILE=1 needs torch>=2.0 (found {torch.__version__}); running the model eagerly.")
+    elif SENTIMENT_COMPILE:
+        # CUDA graphs only pay off on GPU; the CPU inductor path also needs a C++ toolchain
+        mode = "reduce-overhead" if torch.cuda.is_available() else "default"
+        sentiment_pipe.model = torch.compile(sentiment_pipe.model, mode=mode, dynamic=True)
+        # Compile at startup rather than inside the first request's SCRAPE_TIMEOUT
+        sentiment_pipe(["warm up", "warm up the compiled model"], batch_size=32, truncation=True, max_length=128)
+        logger.info(f"Sentiment model compiled with torch.compile (mode={mode}).")
+    return sentiment_pipe
 
-            logger.info("WebDriver initialized successfully.")
+def quantize_sentiment_model(model_name=SENTIMENT_MODEL, save_dir=SENTIMENT_QUANTIZED_DIR):
+    """Exports the model to ONNX and saves a dynamically int8-quantized copy (run offline)."""
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
 
-            # Initialize Sentiment Analysis Model
-            self.sentiment_pipe = pipeline("text-classification", model=sentiment_model)
-            self.translator = Translator()
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    quantizer = ORTQuantizer.from_pretrained(model)
+    # VNNI int8 matmuls; ONNX Runtime falls back to plain AVX2/AVX-512 kernels on older CPUs
+    quantizer.quantize(save_dir=save_dir, quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False))
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(save_dir)
+    logger.info(f"Quantized sentiment model saved to {save_dir}.")
 
-            # ThreadPool for parallel sentiment analysis
-            self.executor = ThreadPoolExecutor(max_workers=4)
+class TwitterSentimentScraper:
+    # Shared across all instances so the model is only loaded once
+    sentiment_pipe = None
+    translator = None
+    _shared_lock = threading.Lock()
+    # The shared pipeline's fast tokenizer is not safe to call from several threads at once
+    _inference_lock = threading.Lock()
 
-        except WebDriverException as e:
-            logger.error(f"Error initializing WebDriver: {e}")
-            logger.debug(traceback.format_exc())
-            raise
+    def __init__(self, sentiment_model=SENTIMENT_MODEL):
+        """Initializes HTTP client, Sentiment Analysis Pipeline, and Translator."""
+        # Nitter serves static server-rendered HTML, so a plain HTTP client is enough
+        self.client = httpx.AsyncClient(
+            base_url=NITTER_URL,
+            timeout=10,
+            http2=True,
+            headers={
+                "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0",
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": "en-US,en;q=0.5",
+            },
+        )
+        logger.info(f"HTTP client initialized for {NITTER_URL}.")
 
-    def analyze_sentiment_async(self, text):
-        """Runs sentiment analysis in a separate thread."""
-        return self.sentiment_pipe(text)[0]
+        # Initialize Sentiment Analysis Model, unless inference is served remotely
+        cls = type(self)
+        self.infer_client = None
+        if INFER_URL:
+            self.infer_client = httpx.AsyncClient(base_url=INFER_URL, timeout=30)
+            logger.info(f"Using remote inference server at {INFER_URL}.")
+        elif cls.sentiment_pipe is None:
+            with cls._shared_lock:
+                if cls.sentiment_pipe is None:
+                    cls.sentiment_pipe = load_sentiment_pipe(sentiment_model)
+        if cls.translator is None:
+            with cls._shared_lock:
+                if cls.translator is None:
+                    cls.translator = Translator()
 
-    def scrape_tweets(self, query, num_pages=2):
-        """Scrapes tweets from Nitter and performs sentiment analysis in parallel."""
-        url = f"https://nitter.net/search?f=tweets&q={query}"
-        logger.info(f"Starting scrape for query: {query}, Number of pages: {num_pages}")
-        
+        # ThreadPool for parallel translation requests
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="translate")
+
+    async def predict(self, texts):
+        """Scores a batch of texts on the inference server if configured, otherwise locally."""
+        if self.infer_client is not None:
+            # One single-item list per text: text-embeddings-inference reads a flat list of
+            # strings as a single input, or as a sentence pair when it has two entries
+            response = await self.infer_client.post("/predict", json={"inputs": [[text] for text in texts]})
+            response.raise_for_status()
+            return self.parse_predictions(response.json(), len(texts))
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.run_pipe, texts)
+
+    @staticmethod
+    def parse_predictions(predictions, expected):
+        """Validates a batch /predict response and keeps the top label for each input."""
+        if not isinstance(predictions, list) or len(predictions) != expected:
+            raise ScrapeError(f"Inference server returned a malformed batch for {expected} texts")
+        results = []
+        for labels in predictions:
+            if not (isinstance(labels, list) and labels
+                    and all(isinstance(p, dict) and "label" in p and "score" in p for p in labels)):
+                raise ScrapeError("Inference server returned a malformed prediction")
+            results.append(max(labels, key=lambda p: p["score"]))
+        return results
+
+    def run_pipe(self, texts):
+        """Runs the shared local pipeline, one batch at a time across all threads."""
+        with self._inference_lock:
+            return self.sentiment_pipe(texts, batch_size=32, truncation=True, max_length=128)
+
+    async def analyze_sentiment(self, texts):
+        """Runs sentiment analysis on a batch of texts, only sending cache misses to the model."""
+        keys = [LRUCache.key("sent:v1", text) for text in texts]
+        results = [sentiment_cache.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            predictions = await self.predict([texts[i] for i in misses])
+            for i, prediction in zip(misses, predictions):
+                sentiment_cache.set(keys[i], prediction)
+                results[i] = prediction
+        return results
+
+    def translate_one(self, text):
+        """Translates a single text to English, returning None if the request fails."""
         try:
-            logger.info(f"Accessing URL: {url}")
-            self.driver.get(url)
-             # Increase the timeout to 30 seconds (you can adjust this as needed)
-            self.wait = WebDriverWait(self.driver, 5)  # Set wait timeout to 30 seconds
-            # Adding a longer timeout, if needed. Adjust the time (e.g., 20 seconds) as required.
-            self.wait.until(EC.presence_of_element_located((By.CLASS_NAME, "timeline")))
-            
-            logger.info(f"Successfully accessed and found tweets on URL: {url}")
-        except TimeoutException as e:
-            logger.warning(f"TimeoutException: Failed to load tweets within the expected time. URL: {url}")
+            return self.translator.translate(text, src='auto', dest='en').text
+        except Exception as e:
+            logger.error(f"Error translating tweet: {e}")
+            logger.debug("Stack Trace:", exc_info=True)
+            return None
+
+    def translate(self, texts):
+        """Translates a batch of texts to English in parallel, reusing cached translations."""
+        keys = [LRUCache.key("xlate:v1:auto", text) for text in texts]
+        results = [translation_cache.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            # Each miss is its own googletrans request; run them concurrently on the executor
+            translations = self.executor.map(self.translate_one, [texts[i] for i in misses])
+            for i, translation in zip(misses, translations):
+                if translation is None:
+                    # Fall back to the original text for this tweet only, and don't cache it
+                    results[i] = texts[i]
+                    continue
+                translation_cache.set(keys[i], translation)
+                results[i] = translation
+        return results
+
+    async def fetch_page(self, params):
+        """Fetches a Nitter search page and returns its parsed HTML, or None on failure."""
+        try:
+            logger.info(f"Accessing URL: {NITTER_URL}/search with params {params}")
+            response = await self.client.get("/search", params=params)
+            response.raise_for_status()
+        except HTTP_TIMEOUTS as e:
+            logger.warning(f"Timeout: Failed to load tweets within the expected time. Params: {params}")
             logger.debug(f"Detailed Error: {str(e)}")
-            return []
-        except WebDriverException as e:
-            logger.error(f"WebDriverException: Error loading URL {url}. Error Details: {str(e)}")
-            logger.debug(f"Stack Trace: {traceback.format_exc()}")
-            return []
+            return None
+        except httpx.HTTPError as e:
+            logger.error(f"HTTPError: Error loading search page {params}. Error Details: {str(e)}")
+            logger.debug("Stack Trace:", exc_info=True)
+            return None
         except Exception as e:
             logger.error(f"Unexpected error occurred while scraping: {str(e)}")
-            logger.debug(f"Stack Trace: {traceback.format_exc()}")
-            return []
-
-        tweet_data = []
-
-        def extract_tweets():
-            """Extracts tweets from the page and performs sentiment analysis."""
-            try:
-                tweets = self.driver.find_elements(By.CLASS_NAME, "timeline-item")
-                if not tweets:
-                    logger.warning("No tweets found on the page.")
-
-                for tweet in tweets:
-                    try:
-                        tweet_link = tweet.find_element(By.CLASS_NAME, "tweet-link").get_attribute("href")
-                        username = tweet.find_element(By.CLASS_NAME, "username").text.strip()
-                        full_name = tweet.find_element(By.CLASS_NAME, "fullname").text.strip()
-                        tweet_date = tweet.find_element(By.CLASS_NAME, "tweet-date").text.strip()
-                        tweet_content = tweet.find_element(By.CLASS_NAME, "tweet-content").text.strip()
-
-                        stats = tweet.find_elements(By.CLASS_NAME, "tweet-stat")
-                        comments, retweets, quotes, likes = (
-                            stats[i].text.strip() if i < len(stats) else "0" for i in range(4)
-                        )
-
-                        try:
-                            image_url = tweet.find_element(By.CLASS_NAME, "avatar.round").get_attribute("src")
-                        except NoSuchElementException:
-                            image_url = None
-
-                        if not tweet_content.isascii():
-                            try:
-                                trans_content = self.translator.translate(tweet_content, src='auto', dest='en').text
-                            except Exception as e:
-                                logger.error(f"Error translating tweet: {e}")
-                                trans_content = tweet_content
-                        else:
-                            trans_content = tweet_content
-
-                        future = self.executor.submit(self.analyze_sentiment_async, trans_content)
-                        sentiment_result = future.result()
-                        sentiment = sentiment_result["label"]
-                        sentiment_score = sentiment_result["score"]
-
-                        tweet_data.append({
-                            "tweet_url": tweet_link,
-                            "username": username,
-                            "full_name": full_name,
-                            "tweet_date": tweet_date,
-                            "tweet_content": tweet_content,
-                            "trans_content": trans_content,
-                            "sentiment": sentiment,
-                            "sentiment_score": sentiment_score,
-                            "comments": comments,
-                            "retweets": retweets,
-                            "quotes": quotes,
-                            "likes": likes,
-                            "image_url": image_url
-                        })
-                    except Exception as e:
-                        logger.error(f"Error extracting tweet: {e}")
-                        logger.debug(traceback.format_exc())
-
-            except Exception as e:
-                logger.error(f"Error while extracting tweets: {e}")
-                logger.debug(traceback.format_exc())
-
-        extract_tweets()
+            logger.debug("Stack Trace:", exc_info=True)
+            return None
+
+        tree = LexborHTMLParser(response.text)
+        if tree.css_first(TIMELINE) is None:
+            logger.warning(f"No timeline found on search page. Params: {params}")
+            return None
+        return tree
+
+    @staticmethod
+    def parse_tweet(tweet, base_url=NITTER_URL):
+        """Parses one timeline item into a tweet dict, or returns None if it is malformed."""
+        find = tweet.css_first
+        try:
+            tweet_content = find(TWEET_CONTENT).text().strip()
+            stats = [stat.text().strip() for stat in tweet.css(TWEET_STAT)]
+            stats += ["0"] * (4 - len(stats))
+            avatar = find(AVATAR)
+            return {
+                "tweet_url": base_url + find(TWEET_LINK).attrs.get("href"),
+                "username": find(USERNAME).text().strip(),
+                "full_name": find(FULLNAME).text().strip(),
+                "tweet_date": find(TWEET_DATE).text().strip(),
+                "tweet_content": tweet_content,
+                "trans_content": tweet_content,
+                "comments": stats[0],
+                "retweets": stats[1],
+                "quotes": stats[2],
+                "likes": stats[3],
+                "image_url": base_url + avatar.attrs.get("src") if avatar is not None else None
+            }
+        except Exception as e:
+            logger.error(f"Error extracting tweet: {e}")
+            logger.debug("Stack Trace:", exc_info=True)
+            return None
+
+    def extract_tweets(self, tree):
+        """Extracts tweets from a parsed page and translates the non-English ones."""
+        try:
+            tweets = tree.css(TIMELINE_ITEM)
+            if not tweets:
+                logger.warning("No tweets found on the page.")
+
+            # Pass 1: parse DOM fields
+            page_tweets = [t for t in map(self.parse_tweet, tweets) if t is not None]
+
+            # Pass 2: translate the page's non-ASCII tweets together, after parsing
+            foreign = [t for t in page_tweets if not t["tweet_content"].isascii()]
+            if foreign:
+                try:
+                    translations = self.translate([t["tweet_content"] for t in foreign])
+                    for tweet, trans_content in zip(foreign, translations):
+                        tweet["trans_content"] = trans_content
+                except Exception as e:
+                    logger.error(f"Error translating tweets: {e}")
+
+        except Exception as e:
+            logger.error(f"Error while extracting tweets: {e}")
+            logger.debug("Stack Trace:", exc_info=True)
+            raise ScrapeError("Failed to extract tweets from page") from e
+
+        return page_tweets
+
+    async def process_page(self, tree):
+        """Extracts one page of tweets and scores them with one batched sentiment call."""
+        # Parsing and translation are blocking, keep them off the event loop
+        loop = asyncio.get_running_loop()
+        page_tweets = await loop.run_in_executor(None, self.extract_tweets, tree)
+        try:
+            results = await self.analyze_sentiment([t["trans_content"] for t in page_tweets])
+        except Exception as e:
+            logger.error(f"Error while analyzing sentiment: {e}")
+            logger.debug("Stack Trace:", exc_info=True)
+            raise ScrapeError("Sentiment analysis failed") from e
+
+        for tweet, sentiment_result in zip(page_tweets, results):
+            tweet["sentiment"] = sentiment_result["label"]
+            tweet["sentiment_score"] = sentiment_result["score"]
+        return page_tweets
+
+    @staticmethod
+    def next_cursor(tree):
+        """Returns the pagination cursor from the page's 'Load more' link, if any."""
+        for link in reversed(tree.css(SHOW_MORE_LINK)):
+            cursor = parse_qs(urlsplit(link.attrs.get("href") or "").query).get("cursor")
+            if cursor:
+                return cursor[0]
+        return None
+
+    @staticmethod
+    async def until(awaitable, deadline):
+        """Awaits with a timeout of whatever is left before the event-loop deadline, if any."""
+        if deadline is None:
+            return await awaitable
+        return await asyncio.wait_for(awaitable, timeout=max(0, deadline - asyncio.get_running_loop().time()))
+
+    async def scrape_stream(self, query, num_pages=2, deadline=None):
+        """Scrapes tweets from Nitter, yielding them page by page as soon as each page is scored.
+
+        `deadline` is an event-loop time; raises asyncio.TimeoutError once it passes.
+        """
+        params = {"f": "tweets", "q": query}
+        logger.info(f"Starting scrape for query: {query}, Number of pages: {num_pages}")
+
+        tree = await self.until(self.fetch_page(params), deadline)
+        if tree is None:
+            raise ScrapeError("Failed to load search results")
+        logger.info(f"Successfully accessed and found tweets for query: {query}")
+
+        tweet_count = 0
+        next_page = None
 
         logger.info("Twitter data scraping started...")
 
-        for _ in range(num_pages):
-            try:
-                load_more_button = self.driver.find_element(By.CLASS_NAME, "show-more")
-                self.driver.execute_script("arguments[0].click();", load_more_button)
-                time.sleep(2)
-                extract_tweets()
-            except NoSuchElementException:
-                logger.warning("No more 'Load More' button found. Stopping pagination.")
-                break
-            except Exception as e:
-                logger.error(f"Error clicking 'Load More' button: {e}")
-                logger.debug(traceback.format_exc())
-                break
-
-        logger.info(f"Twitter data scraping completed. {len(tweet_data)} tweets extracted.")
-
-        return tweet_data
-
-    def close(self):
-        """Closes the WebDriver."""
+        # Each page carries the cursor for the next one, so pages cannot be fetched all at once;
+        # instead the next page is downloaded while the current one is being processed
+        try:
+            for page in range(num_pages + 1):
+                cursor = self.next_cursor(tree) if page < num_pages else None
+                next_page = asyncio.ensure_future(self.fetch_page({**params, "cursor": cursor})) if cursor else None
+                for tweet in await self.until(self.process_page(tree), deadline):
+                    tweet_count += 1
+                    yield tweet
+
+                if next_page is None:
+                    if page < num_pages:
+                        logger.warning("No more 'Load More' cursor found. Stopping pagination.")
+                    break
+                tree = await self.until(next_page, deadline)
+                next_page = None
+                if tree is None:
+                    raise ScrapeError(f"Failed to load page {page + 2}")
+        finally:
+            # The consumer may stop early or be cancelled while the next page is in flight
+            if next_page is not None:
+                next_page.cancel()
+
+        logger.info(f"Twitter data scraping completed. {tweet_count} tweets extracted.")
+
+    async def close(self):
+        """Closes the HTTP client and executor."""
         try:
-            self.driver.quit()
+            await self.client.aclose()
+            if self.infer_client is not None:
+                await self.infer_client.aclose()
             self.executor.shutdown(wait=False)
-            logger.info("WebDriver and executor closed successfully.")
+            logger.info("HTTP client and executor closed successfully.")
         except Exception as e:
-            logger.error(f"Error closing WebDriver: {e}")
-            logger.debug(traceback.format_exc())
+            logger.error(f"Error closing HTTP client: {e}")
+            logger.debug("Stack Trace:", exc_info=True)
 
-# Global scraper instance and lock
-scraper_lock = threading.Lock()
+# Global scraper instance; one async HTTP client serves concurrent requests
 scraper = None
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", "120"))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage startup and shutdown of resources."""
     global scraper
     logger.info("Starting FastAPI application...")
-    with scraper_lock:
-        if scraper is None:
-            scraper = TwitterSentimentScraper()
+    # Each worker process runs its own tokenizer; nested tokenizer threads would oversubscribe the CPU
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    if scraper is None:
+        scraper = TwitterSentimentScraper()
     yield  # Application runs while this is active
     if scraper is not None:
-        scraper.close()
+        await scraper.close()
     logger.info("Shutting down FastAPI application...")
 
 app = FastAPI(lifespan=lifespan)
@@ -209,18 +448,53 @@ app.add_middleware(
 )
 
 def get_scraper():
-    """Dependency to get scraper instance."""
+    """Dependency to get scraper instance, created lazily once per worker process."""
     global scraper
-    with scraper_lock:
-        if scraper is None:
-            scraper = TwitterSentimentScraper()
+    if scraper is None:
+        scraper = TwitterSentimentScraper()
     return scraper
 
 @app.post("/analyze")
-def analyze(request: RequestData, scraper_instance=Depends(get_scraper)):
-    """API endpoint to analyze tweets for sentiment."""
-    try:
-        result = scraper_instance.scrape_tweets(request.text)
-        return {"results": result}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def analyze(request: RequestData, scraper_instance=Depends(get_scraper)):
+    """API endpoint to analyze tweets for sentiment, streamed back as NDJSON, one tweet per line.
+
+    If the results are incomplete, the stream ends with a final {"error": ...} line.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SCRAPE_TIMEOUT
+
+    async def stream_results():
+        # SCRAPE_TIMEOUT bounds the whole stream; the generator enforces it so that it is only
+        # ever driven from this task, and cancellation unwinds it before aclose runs
+        tweets = scraper_instance.scrape_stream(request.text, deadline=deadline)
+        try:
+            async for tweet in tweets:
+                yield json.dumps(tweet) + "\n"
+        # Headers are already sent, so errors are reported as a final NDJSON line
+        except asyncio.TimeoutError:
+            logger.error(f"Scrape timed out after {SCRAPE_TIMEOUT}s for query: {request.text}")
+            yield json.dumps({"error": "Scraping timed out"}) + "\n"
+        except ScrapeError as e:
+            logger.error(f"Scrape failed for query {request.text}: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+        except Exception as e:
+            logger.error(f"Error while streaming results: {e}")
+            logger.debug("Stack Trace:", exc_info=True)
+            yield json.dumps({"error": str(e)}) + "\n"
+        finally:
+            await tweets.aclose()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:2] == ["quantize"]:
+        # python main.py quantize [save_dir], then run with SENTIMENT_BACKEND=onnx-int8
+        quantize_sentiment_model(save_dir=sys.argv[2] if len(sys.argv) > 2 else SENTIMENT_QUANTIZED_DIR)
+        sys.exit(0)
+
+    # Production: gunicorn -w $WEB_CONCURRENCY -k uvicorn.workers.UvicornWorker main:app
+    import uvicorn
+
+    uvicorn.run("main:app", host="0.0.0.0", port=int(os.getenv("PORT", "8000")), workers=WEB_CONCURRENCY)